@@ -1,33 +1,227 @@
 # gudoai_api_client.py
-import json
+import atexit
+import copy
+import mmap
 import os
+import struct
+from typing import Optional, Union
+
+import msgspec
+import zstandard
+
+
+def atomic_write(path, data):
+    """Tahapan 2 & 3: Menulis file secara atomik (file sementara + fsync + rename).
+
+    - Jika proses mati di tengah penulisan, file lama tetap utuh.
+    """
+    tmp = path + '.tmp'
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class ProjectRecord(msgspec.Struct, omit_defaults=True):
+    """Tahapan 2 & 3: Satu entri proyek di database API simulasi.
+
+    - Field yang masih bernilai default tidak ikut ditulis ke disk.
+    - file_manifest berisi hash daftar file; record lama masih menyimpan list path.
+    """
+    project_id: str
+    project_name: str
+    commit_hash: str
+    version: int
+    description: str
+    file_manifest: Union[str, list[str]] = []
+    last_synced_commit: Optional[str] = None
+    is_deployed: bool = False
+
+
+class LogEntry(msgspec.Struct):
+    """Tahapan 2 & 3: Satu frame di journal database ("put" = simpan record)."""
+    op: str
+    data: ProjectRecord
+
+
+# Codec yang dikompilasi sekali untuk tipe di atas, dipakai ulang tiap frame
+_FRAME_HEADER = struct.Struct('>I')
+_LOG_ENCODER = msgspec.msgpack.Encoder()
+_LOG_DECODER = msgspec.msgpack.Decoder(list[LogEntry])
+_LEGACY_DECODER = msgspec.json.Decoder(dict[str, ProjectRecord])
+_ZSTD_COMPRESSOR = zstandard.ZstdCompressor(level=3)
+_ZSTD_DECOMPRESSOR = zstandard.ZstdDecompressor()
+
 
 class GudoaiApiClient:
+    # Cache hasil replay per proses: db_file (path absolut) -> (mtime_ns, ukuran, projects, log_entries, torn_tail)
+    _cache = {}
+
     def __init__(self):
         """Tahapan 2 & 3: Inisialisasi klien API simulasi.
         
-        - Membaca database dari file .gudoai_api_db.json.
-        - Jika file tidak ada, buat database kosong.
+        - Membaca database dari file .gudoai_api_db.msgpack.
+        - Jika file tidak ada atau kosong, coba baca database lama .gudoai_api_db.json.
+        - Jika keduanya tidak ada, buat database kosong.
+        - Database baru dibaca saat `projects` pertama kali diakses.
+        - Perubahan disimpan di memori dan baru ditulis saat flush()/close()
+          atau ketika proses selesai (hanya untuk klien yang belum di-close()).
+        """
+        # Path absolut: flush saat proses selesai tetap menulis ke direktori yang sama
+        self.db_file = os.path.abspath('.gudoai_api_db.msgpack')
+        self.legacy_db_file = os.path.abspath('.gudoai_api_db.json')
+        self._log_entries = 0     # Jumlah entri di journal (termasuk yang sudah usang)
+        self._torn_tail = False   # True jika journal diakhiri frame yang terpotong
+        self._fresh = True        # True jika journal belum ada atau masih kosong
+        self._pending = {}        # project_id -> (op, record) yang belum ditulis
+        self._dirty = False
+        self._projects = {}
+        self._loaded = False
+        atexit.register(self._flush_if_dirty)
+
+    @property
+    def projects(self):
+        """Tahapan 2 & 3: Data proyek; dimuat dari disk pada akses pertama."""
+        if not self._loaded:
+            self._projects = self._load_projects()
+            self._loaded = True
+        return self._projects
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def flush(self):
+        """Tahapan 2 & 3: Menulis semua perubahan yang tertunda ke journal."""
+        self._flush_if_dirty()
+
+    def close(self):
+        """Tahapan 2 & 3: Menutup klien; perubahan tertunda ikut ditulis.
+
+        - Hook atexit klien ini dilepas agar klien yang sudah ditutup bisa dibebaskan.
         """
-        self.db_file = '.gudoai_api_db.json'
-        self.projects = self._load_projects()
+        try:
+            self._flush_if_dirty()
+        finally:
+            atexit.unregister(self._flush_if_dirty)
 
     def _load_projects(self):
-        """Tahapan 2 & 3: Memuat data proyek dari file JSON."""
-        if os.path.exists(self.db_file):
+        """Tahapan 2 & 3: Memuat data proyek dengan memutar ulang journal MessagePack.
+
+        - Setiap frame diawali header 4 byte (big-endian) berisi panjang frame.
+        - Isi frame adalah daftar entri MessagePack yang dikompresi zstd.
+        - Frame terakhir yang terpotong (misal proses mati saat menulis) diabaikan,
+          dan journal dipadatkan ulang pada flush berikutnya.
+        - Journal di-mmap sehingga frame didekompresi langsung dari page cache.
+        - Jika journal tidak berubah sejak terakhir dibaca di proses ini, pakai cache kelas.
+        """
+        try:
             try:
-                with open(self.db_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"[ERROR] Failed to load projects database: {e}")
-                return {}
-        else:
+                st = os.stat(self.db_file)
+            except FileNotFoundError:
+                return self._load_legacy_projects()
+            if st.st_size == 0:
+                return self._load_legacy_projects()
+            self._fresh = False
+            cache_key = self.db_file
+            cached = type(self)._cache.get(cache_key)
+            if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                return self._restore(cached[2:])
+            with open(self.db_file, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as buf:
+                        projects = self._replay(buf)
+            type(self)._cache[cache_key] = (st.st_mtime_ns, st.st_size) + self._snapshot(projects)
+            return projects
+        except Exception as e:
+            print(f"[ERROR] Failed to load projects database: {e}")
             return {}
 
-    def _save_projects(self):
-        """Tahapan 2 & 3: Menyimpan data proyek ke file JSON."""
-        with open(self.db_file, 'w') as f:
-            json.dump(self.projects, f, indent=2)
+    def _load_legacy_projects(self):
+        """Tahapan 2 & 3: Memuat database format lama (.gudoai_api_db.json), jika ada."""
+        try:
+            with open(self.legacy_db_file, 'rb') as f:
+                return _LEGACY_DECODER.decode(f.read())
+        except FileNotFoundError:
+            return {}
+
+    def _replay(self, buf):
+        """Tahapan 2 & 3: Menerapkan semua frame journal ke dict proyek."""
+        projects = {}
+        offset = 0
+        header_size = _FRAME_HEADER.size
+        self._log_entries = 0
+        while offset + header_size <= len(buf):
+            (length,) = _FRAME_HEADER.unpack_from(buf, offset)
+            end = offset + header_size + length
+            if end > len(buf):
+                break
+            entries = _LOG_DECODER.decode(_ZSTD_DECOMPRESSOR.decompress(buf[offset + header_size:end]))
+            for entry in entries:
+                if entry.op == 'put':
+                    projects[entry.data.project_id] = entry.data
+            self._log_entries += len(entries)
+            offset = end
+        # Sisa byte setelah frame utuh terakhir adalah sampah; frame baru tidak boleh ditulis di belakangnya
+        self._torn_tail = offset < len(buf)
+        return projects
+
+    def _snapshot(self, projects):
+        """Tahapan 2 & 3: Salinan state hasil replay untuk disimpan di cache kelas."""
+        return ({pid: copy.copy(p) for pid, p in projects.items()}, self._log_entries, self._torn_tail)
+
+    def _restore(self, snapshot):
+        """Tahapan 2 & 3: Memulihkan state dari cache; setiap klien mendapat salinan sendiri."""
+        projects, self._log_entries, self._torn_tail = snapshot
+        return {pid: copy.copy(p) for pid, p in projects.items()}
+
+    def _frame(self, entries):
+        """Tahapan 2 & 3: Membungkus sekumpulan entri menjadi satu frame journal terkompresi."""
+        buf = _ZSTD_COMPRESSOR.compress(_LOG_ENCODER.encode(entries))
+        return _FRAME_HEADER.pack(len(buf)) + buf
+
+    def _append_record(self, op, payload):
+        """Tahapan 2 & 3: Mencatat satu perubahan untuk ditulis ke journal saat flush.
+
+        - Beberapa perubahan pada proyek yang sama cukup ditulis sekali (entri terakhir).
+        """
+        self._pending[payload.project_id] = (op, payload)
+        self._dirty = True
+
+    def _flush_if_dirty(self):
+        """Tahapan 2 & 3: Menulis semua perubahan tertunda sebagai satu frame di akhir journal.
+
+        - Jika journal belum ada atau kosong (database baru atau masih format JSON lama),
+          tulis ulang seluruh isi database lewat _compact().
+        - Jika journal diakhiri frame yang terpotong, tulis ulang lewat _compact() juga.
+        - Jika entri di journal sudah lebih dari 4x jumlah proyek, padatkan.
+        """
+        if not self._dirty:
+            return
+        rewrite = self._fresh or self._torn_tail
+        if not rewrite:
+            entries = [LogEntry(op=op, data=payload) for op, payload in self._pending.values()]
+            with open(self.db_file, 'ab') as f:
+                f.write(self._frame(entries))
+            self._log_entries += len(entries)
+        if rewrite or self._log_entries > 4 * len(self.projects):
+            self._compact()
+        self._pending = {}
+        self._dirty = False
+        type(self)._cache.pop(self.db_file, None)
+
+    def _compact(self):
+        """Tahapan 2 & 3: Menulis ulang journal sebagai satu frame berisi record terbaru tiap proyek."""
+        entries = [LogEntry(op='put', data=project) for project in self.projects.values()]
+        atomic_write(self.db_file, self._frame(entries))
+        self._log_entries = len(entries)
+        self._torn_tail = False
+        self._fresh = False
 
     def register_project(self, project_id, project_name, commit_hash, version, description):
         """Tahapan 2 & 3: Mendaftarkan proyek ke API simulasi.
@@ -35,19 +229,18 @@ class GudoaiApiClient:
         - Jika project_id sudah ada, kembalikan error 409.
         - Jika belum ada, tambahkan ke database dan kembalikan respons 201.
         """
-        if project_id in self.projects:
+        projects = self.projects
+        if projects.get(project_id) is not None:
             return 409, {"error": "Project ID already registered"}
-        self.projects[project_id] = {
-            "project_id": project_id,
-            "project_name": project_name,
-            "commit_hash": commit_hash,
-            "version": version,
-            "description": description,
-            "file_manifest": [],
-            "last_synced_commit": None,
-            "is_deployed": False
-        }
-        self._save_projects()
+        project = ProjectRecord(
+            project_id=project_id,
+            project_name=project_name,
+            commit_hash=commit_hash,
+            version=version,
+            description=description
+        )
+        projects[project_id] = project
+        self._append_record('put', project)
         return 201, {"message": "Project registered", "registry_id": project_id}
 
     def sync_project(self, project_id, commit_hash, version, description, file_manifest):
@@ -57,18 +250,17 @@ class GudoaiApiClient:
         - Jika versi tidak valid, kembalikan error 400.
         - Jika berhasil, perbarui data dan kembalikan respons 200.
         """
-        if project_id not in self.projects:
+        project = self.projects.get(project_id)
+        if project is None:
             return 404, {"error": "Project not found"}
-        if version <= self.projects[project_id]["version"]:
+        if version <= project.version:
             return 400, {"error": "Stale data: metadata_version must be greater than current."}
-        self.projects[project_id].update({
-            "commit_hash": commit_hash,
-            "version": version,
-            "description": description,
-            "file_manifest": file_manifest,
-            "last_synced_commit": commit_hash
-        })
-        self._save_projects()
+        project.commit_hash = commit_hash
+        project.version = version
+        project.description = description
+        project.file_manifest = file_manifest
+        project.last_synced_commit = commit_hash
+        self._append_record('put', project)
         return 200, {"message": "Project state synchronized", "last_synced_commit": commit_hash}
 
     def get_project_status(self, project_id):
@@ -77,6 +269,7 @@ class GudoaiApiClient:
         - Jika proyek tidak ada, kembalikan error 404.
         - Jika ada, kembalikan data proyek.
         """
-        if project_id not in self.projects:
+        project = self.projects.get(project_id)
+        if project is None:
             return 404, {"error": "Project not found"}
-        return 200, self.projects[project_id]
\ No newline at end of file
+        return 200, msgspec.structs.asdict(project)
\ No newline at end of file
@@ -1,8 +1,8 @@
 # gudoai_cli.py
 import argparse
-from gudoai_core import GudoaiCore
 
-def main():
+def _build_parser():
+    """Membangun parser argumen CLI (dipanggil sekali saat modul di-import)."""
     parser = argparse.ArgumentParser(description="GUDOAI - Grand Unified DevOps Orchestrator & API Interrogator")
     subparsers = parser.add_subparsers(dest='command', required=True, help='Available commands')
 
@@ -37,28 +37,36 @@ def main():
     status_parser = subparsers.add_parser('check_api_status', help='Check project status from API')
     status_parser.add_argument('project_name', type=str, help='Name of the project')
 
-    args = parser.parse_args()
+    return parser
 
-    core = GudoaiCore()
+PARSER = _build_parser()
+
+def main(argv=None):
+    parser = PARSER
+    args = parser.parse_args(argv)
+
+    # Import di sini agar `--help` dan argumen salah tidak ikut memuat GudoaiCore
+    from gudoai_core import GudoaiCore
 
     try:
-        if args.command == 'init':
-            core.init_project(args.project_name)
-        elif args.command == 'update_meta':
-            core.update_metadata(args.project_name, args.description)
-        elif args.command == 'create_feature_branch':
-            core.create_feature_branch(args.project_name, args.branch_name)
-        elif args.command == 'merge_to_main':
-            if not core.merge_to_main(args.project_name, args.feature_branch_name):
-                print("[ERROR] Merge failed due to conflicts.")
-        elif args.command == 'register_project':
-            core.register_project(args.project_name)
-        elif args.command == 'sync_project':
-            core.sync_project(args.project_name)
-        elif args.command == 'check_api_status':
-            core.check_api_status(args.project_name)
-        else:
-            parser.print_help()
+        with GudoaiCore() as core:
+            if args.command == 'init':
+                core.init_project(args.project_name)
+            elif args.command == 'update_meta':
+                core.update_metadata(args.project_name, args.description)
+            elif args.command == 'create_feature_branch':
+                core.create_feature_branch(args.project_name, args.branch_name)
+            elif args.command == 'merge_to_main':
+                if not core.merge_to_main(args.project_name, args.feature_branch_name):
+                    print("[ERROR] Merge failed due to conflicts.")
+            elif args.command == 'register_project':
+                core.register_project(args.project_name)
+            elif args.command == 'sync_project':
+                core.sync_project(args.project_name)
+            elif args.command == 'check_api_status':
+                core.check_api_status(args.project_name)
+            else:
+                parser.print_help()
     except Exception as e:
         print(f"[ERROR] {e}")
 
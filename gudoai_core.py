@@ -2,16 +2,95 @@
 import os
 import json
 import uuid
+import shutil
+import hashlib
+import functools
 import subprocess
-from gudoai_api_client import GudoaiApiClient  # Modul untuk berinteraksi dengan API simulasi
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+try:
+    import pygit2  # Opsional: membaca repositori Git langsung tanpa membuat proses baru
+except ImportError:
+    pygit2 = None
+try:
+    from dulwich.repo import Repo as DulwichRepo  # Opsional: pembaca index Git tanpa subprocess
+    from dulwich.errors import NotGitRepository
+except ImportError:
+    DulwichRepo = None
+from gudoai_api_client import GudoaiApiClient, atomic_write  # Modul untuk berinteraksi dengan API simulasi
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_meta(meta_path, mtime_ns, size):
+    """Tahapan 1: Mem-parse gudoai_meta.json; hasil di-cache per (path, mtime, ukuran)."""
+    with open(meta_path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def _read_meta(project_name):
+    """Tahapan 1: Membaca gudoai_meta.json milik proyek.
+
+    - File hanya di-parse ulang jika mtime atau ukurannya berubah.
+    - Yang dikembalikan adalah salinan, sehingga aman untuk diubah.
+    """
+    meta_path = os.path.join(project_name, "gudoai_meta.json")
+    st = os.stat(meta_path)
+    return dict(_parse_meta(meta_path, st.st_mtime_ns, st.st_size))
+
+
+def _write_meta(project_name, meta):
+    """Tahapan 1: Menyimpan gudoai_meta.json secara atomik dan membuang cache hasil parse."""
+    meta_path = os.path.join(project_name, "gudoai_meta.json")
+    atomic_write(meta_path, orjson.dumps(meta, option=orjson.OPT_INDENT_2))
+    _parse_meta.cache_clear()
+
 
 class GudoaiCore:
+    """Tahapan 3: Operasi proyek GUDOAI (metadata, Git, dan API simulasi).
+
+    - Commit metadata berjalan di background, jadi pesan sukses bisa tercetak
+      sebelum commit benar-benar dibuat dan kegagalannya baru muncul kemudian.
+    - Panggil close() (atau pakai `with GudoaiCore() as core:`) sebelum menjalankan
+      perintah Git lain pada proyek, agar semua commit sudah selesai.
+    """
+
     def __init__(self):
         """Tahapan 3: Inisialisasi objek GudoaiCore.
         
-        - Membuat klien API untuk interaksi dengan server simulasi.
+        - Klien API untuk interaksi dengan server simulasi dibuat saat pertama dipakai.
+        - Commit metadata dijalankan di background oleh satu worker (berurutan per sesi).
         """
-        self.api_client = GudoaiApiClient()
+        self._api_client = None
+        self._repos = {}  # project_name -> pygit2.Repository yang sudah dibuka
+        self._git = shutil.which('git') or 'git'  # Path absolut, agar tidak dicari di PATH tiap kali
+        self._git_read_env = dict(os.environ, GIT_OPTIONAL_LOCKS='0')  # Untuk perintah Git baca-saja
+        self._git_pool = None   # Worker commit; dibuat saat commit pertama
+        self._git_queue = []    # (pesan, future) commit yang belum dipastikan selesai
+
+    @property
+    def api_client(self):
+        """Tahapan 3: Klien API; dibuat pada akses pertama agar perintah Git saja tidak membaca database."""
+        if self._api_client is None:
+            self._api_client = GudoaiApiClient()
+        return self._api_client
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        """Tahapan 3: Menutup sesi: tunggu commit Git di background, hentikan worker-nya, dan tulis database API."""
+        try:
+            self._wait_for_git()
+        finally:
+            if self._git_pool is not None:
+                self._git_pool.shutdown(wait=True)
+                self._git_pool = None
+            if self._api_client is not None:
+                self._api_client.close()
 
     def init_project(self, project_name):
         """Tahapan 1: Fungsi untuk membuat proyek baru.
@@ -21,9 +100,10 @@ class GudoaiCore:
         - Membuat file metadata gudoai_meta.json.
         - Melakukan commit awal ke Git.
         """
-        if os.path.exists(project_name):
+        try:
+            os.makedirs(project_name)
+        except FileExistsError:
             raise FileExistsError(f"Project '{project_name}' already exists.")
-        os.makedirs(project_name)
         print(f"Created directory: {project_name}")
         self._create_gudoai_meta(project_name)      # Membuat file metadata
         self._init_git_repo(project_name)          # Inisialisasi repositori Git
@@ -47,8 +127,7 @@ class GudoaiCore:
             "last_api_sync_commit_hash": None,              # Belum pernah sync dengan API
             "api_registered": False                         # Belum terdaftar di API
         }
-        with open(meta_path, 'w') as f:
-            json.dump(meta, f, indent=2)  # Simpan data ke file JSON
+        _write_meta(project_name, meta)  # Simpan data ke file JSON
         print(f"Created metadata file in: {meta_path}")
 
     def _init_git_repo(self, project_name):
@@ -58,7 +137,7 @@ class GudoaiCore:
         - Jika gagal, error akan dilemparkan.
         """
         result = subprocess.run(
-            ['git', 'init'],
+            [self._git, 'init'],
             cwd=project_name,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
@@ -75,10 +154,47 @@ class GudoaiCore:
         - Git digunakan untuk version control.
         """
         meta_path = os.path.join(project_name, "gudoai_meta.json")
-        subprocess.run(['git', 'add', 'gudoai_meta.json'], cwd=project_name, check=True)
-        subprocess.run(['git', 'commit', '-m', 'GUDOAI: Initial project setup'], cwd=project_name, check=True)
+        subprocess.run([self._git, 'add', 'gudoai_meta.json'], cwd=project_name, check=True)
+        subprocess.run([self._git, 'commit', '-m', 'GUDOAI: Initial project setup'], cwd=project_name, check=True)
         print("Performed initial Git commit")
 
+    def _git_commit_meta(self, project_name, message):
+        """Tahapan 1 & 5: Commit perubahan gudoai_meta.json dalam satu proses Git.
+
+        - `git commit -o` men-stage dan meng-commit hanya file tersebut, tanpa `git add` terpisah.
+        - Hanya bisa dipakai setelah file sudah dilacak (setelah commit awal).
+        - Commit dikirim ke worker background; fungsi ini langsung kembali, sebelum
+          commit dibuat. Pemanggil harus memanggil close() sebelum menjalankan perintah
+          Git lain di luar GudoaiCore; error commit baru dilemparkan saat itu.
+        - Worker dibuat saat commit pertama dan dihentikan oleh close(). Sesi yang tidak
+          ditutup tetap menyelesaikan commit-nya saat interpreter keluar (worker
+          concurrent.futures di-join otomatis).
+        """
+        if self._git_pool is None:
+            self._git_pool = ThreadPoolExecutor(max_workers=1)
+        future = self._git_pool.submit(
+            subprocess.run,
+            [self._git, 'commit', '-o', 'gudoai_meta.json', '-m', message],
+            cwd=project_name,
+            check=True
+        )
+        self._git_queue.append((message, future))
+
+    def _wait_for_git(self):
+        """Tahapan 5: Menunggu semua commit di background selesai.
+
+        - Dipanggil sebelum operasi Git lain agar tidak membaca HEAD/index yang belum final,
+          dan sebelum gudoai_meta.json ditulis ulang agar commit yang tertunda tidak
+          ikut mengambil isi file yang lebih baru.
+        - Jika ada commit yang gagal, error-nya dilemparkan di sini beserta pesan commit-nya.
+        """
+        queue, self._git_queue = self._git_queue, []
+        for message, future in queue:
+            try:
+                future.result()
+            except (OSError, subprocess.CalledProcessError) as e:
+                raise RuntimeError(f"Background git commit '{message}' failed: {e}") from e
+
     def update_metadata(self, project_name, new_description):
         """Tahapan 1: Memperbarui deskripsi dan meningkatkan versi.
         
@@ -88,18 +204,16 @@ class GudoaiCore:
         - Lakukan commit otomatis ke Git.
         """
         meta_path = os.path.join(project_name, "gudoai_meta.json")
-        with open(meta_path, 'r') as f:
-            try:
-                meta = json.load(f)
-            except json.JSONDecodeError:
-                raise ValueError(f"File {meta_path} is not valid JSON.")
+        try:
+            meta = _read_meta(project_name)
+        except json.JSONDecodeError:
+            raise ValueError(f"File {meta_path} is not valid JSON.")
         meta['description'] = new_description
         meta['version'] += 1
-        with open(meta_path, 'w') as f:
-            json.dump(meta, f, indent=2)
-        subprocess.run(['git', 'add', 'gudoai_meta.json'], cwd=project_name, check=True)
+        self._wait_for_git()  # Commit sebelumnya harus selesai sebelum file ditimpa
+        _write_meta(project_name, meta)
         commit_message = f"GUDOAI: Updated metadata - version {meta['version']}"
-        subprocess.run(['git', 'commit', '-m', commit_message], cwd=project_name, check=True)
+        self._git_commit_meta(project_name, commit_message)
         print(f"Metadata for '{project_name}' updated. Version: {meta['version']}")
 
     def create_feature_branch(self, project_name, branch_name):
@@ -109,8 +223,9 @@ class GudoaiCore:
         - Jika gagal, error akan muncul.
         """
         branch_name = f"feature/{branch_name}"  # Format branch sesuai konvensi Git
+        self._wait_for_git()
         result = subprocess.run(
-            ['git', 'checkout', '-b', branch_name],
+            [self._git, 'checkout', '-b', branch_name],
             cwd=project_name,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
@@ -125,30 +240,107 @@ class GudoaiCore:
         
         - Jika ada konflik, tidak lanjutkan commit.
         - Jika berhasil, lakukan commit.
+        - Dengan pygit2, checkout dan merge dilakukan di dalam proses tanpa memanggil git.
         """
         feature_branch = f"feature/{feature_branch_name}"
-        result = subprocess.run(
-            ['git', 'checkout', 'master'],
-            cwd=project_name,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        if result.returncode != 0:
-            raise RuntimeError(f"Failed to switch to main branch: {result.stderr}")
-        result = subprocess.run(
-            ['git', 'merge', feature_branch],
-            cwd=project_name,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        if result.returncode != 0:
+        self._wait_for_git()
+        repo = self._open_repo(project_name)
+        if repo is not None:
+            merged = self._merge_in_process(repo, feature_branch)
+        else:
+            result = subprocess.run(
+                [self._git, 'checkout', 'master'],
+                cwd=project_name,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+            if result.returncode != 0:
+                raise RuntimeError(f"Failed to switch to main branch: {result.stderr}")
+            result = subprocess.run(
+                [self._git, '-c', 'gc.auto=0', 'merge', feature_branch],
+                cwd=project_name,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+            merged = result.returncode == 0
+        if not merged:
             print("⚠️ Konflik ditemukan. Merge tidak dilanjutkan.")
             return False
         print(f"Branch '{feature_branch}' berhasil digabungkan ke main.")
         return True
 
+    def _merge_in_process(self, repo, feature_branch):
+        """Tahapan 1 & 5: Checkout master lalu merge branch feature lewat pygit2.
+
+        - Fast-forward jika memungkinkan; jika tidak, buat merge commit.
+        - Jika ada konflik, index dan working tree dibiarkan seperti `git merge`.
+        - Jika merge commit gagal dibuat, merge dibatalkan sebelum error dilemparkan.
+        - Mengembalikan False jika branch tidak ada atau terjadi konflik.
+        """
+        master = repo.branches.local.get('master')
+        if master is None:
+            raise RuntimeError("Failed to switch to main branch: branch 'master' not found")
+        try:
+            repo.checkout(master)
+        except pygit2.GitError as e:
+            raise RuntimeError(f"Failed to switch to main branch: {e}")
+        feature = repo.branches.local.get(feature_branch)
+        if feature is None:
+            return False
+        analysis, _ = repo.merge_analysis(feature.target)
+        if analysis & pygit2.GIT_MERGE_ANALYSIS_UP_TO_DATE:
+            return True
+        try:
+            if analysis & pygit2.GIT_MERGE_ANALYSIS_FASTFORWARD:
+                repo.checkout_tree(repo.get(feature.target))
+                master.set_target(feature.target)
+                return True
+            # Identitas dibaca sebelum merge agar kegagalan tidak meninggalkan merge setengah jadi
+            author = self._git_signature(repo, 'AUTHOR')
+            committer = self._git_signature(repo, 'COMMITTER')
+        except (pygit2.GitError, KeyError) as e:
+            raise RuntimeError(f"Failed to merge '{feature_branch}': {e}")
+        try:
+            repo.merge(feature.target)
+        except pygit2.GitError as e:
+            repo.state_cleanup()  # Merge ditolak (misal ada perubahan lokal); working tree tidak disentuh
+            raise RuntimeError(f"Failed to merge '{feature_branch}': {e}")
+        if repo.index.conflicts is not None:
+            return False
+        try:
+            tree = repo.index.write_tree()
+            repo.create_commit(
+                'HEAD',
+                author,
+                committer,
+                f"Merge branch '{feature_branch}'",
+                tree,
+                [repo.head.target, feature.target]
+            )
+            repo.state_cleanup()
+        except Exception as e:
+            # Batalkan merge: hapus MERGE_HEAD dan kembalikan index/working tree ke HEAD
+            repo.state_cleanup()
+            repo.reset(repo.head.target, pygit2.GIT_RESET_HARD)
+            raise RuntimeError(f"Failed to merge '{feature_branch}': {e}")
+        return True
+
+    def _git_signature(self, repo, role):
+        """Tahapan 5: Identitas Git untuk commit, seperti yang dipakai `git commit`/`git merge`.
+
+        - GIT_<role>_NAME dan GIT_<role>_EMAIL (role: AUTHOR/COMMITTER) diutamakan.
+        - Field yang tidak di-set diambil dari user.name/user.email di konfigurasi Git.
+        """
+        name = os.environ.get(f'GIT_{role}_NAME')
+        email = os.environ.get(f'GIT_{role}_EMAIL')
+        if name is None or email is None:
+            default = repo.default_signature
+            name = default.name if name is None else name
+            email = default.email if email is None else email
+        return pygit2.Signature(name, email)
+
     def register_project(self, project_name):
         """Tahapan 2 & 3: Mendaftarkan proyek ke API simulasi.
         
@@ -158,10 +350,8 @@ class GudoaiCore:
         - Kirim data ke API via POST /v1/projects.
         - Jika sukses, perbarui metadata dan lakukan commit.
         """
-        meta_path = os.path.join(project_name, "gudoai_meta.json")
         try:
-            with open(meta_path, 'r') as f:
-                meta = json.load(f)
+            meta = _read_meta(project_name)
         except (FileNotFoundError, json.JSONDecodeError) as e:
             raise ValueError(f"Failed to read metadata: {e}")
         if meta.get("api_registered", False):
@@ -178,10 +368,9 @@ class GudoaiCore:
             meta["api_registered"] = True
             meta["last_api_sync_commit_hash"] = commit_hash
             meta["version"] += 1  # Tambahkan versi setelah registrasi
-            with open(meta_path, 'w') as f:
-                json.dump(meta, f, indent=2)
-            subprocess.run(['git', 'add', 'gudoai_meta.json'], cwd=project_name, check=True)
-            subprocess.run(['git', 'commit', '-m', 'GUDOAI: Project registered to API'], cwd=project_name, check=True)
+            self._wait_for_git()  # Commit sebelumnya harus selesai sebelum file ditimpa
+            _write_meta(project_name, meta)
+            self._git_commit_meta(project_name, 'GUDOAI: Project registered to API')
             print("✅ Project successfully registered with the API.")
         else:
             print(f"❌ Failed to register project: {response.get('error', 'Unknown error')}")
@@ -191,42 +380,63 @@ class GudoaiCore:
         
         - Baca file gudoai_meta.json.
         - Jika belum terdaftar, error.
-        - Dapatkan hash commit dan daftar file yang dilacak.
+        - Dapatkan hash commit dan ringkasan (hash) daftar file yang dilacak.
         - Kirim ke API via PUT /v1/projects/{project_id}/sync.
         - Jika sukses, perbarui metadata dan lakukan commit.
         """
-        meta_path = os.path.join(project_name, "gudoai_meta.json")
         try:
-            with open(meta_path, 'r') as f:
-                meta = json.load(f)
+            meta = _read_meta(project_name)
         except (FileNotFoundError, json.JSONDecodeError) as e:
             raise ValueError(f"Failed to read metadata: {e}")
         if not meta.get("api_registered", False):
             raise ValueError("Project not registered with the API.")
         commit_hash = self._get_current_commit_hash(project_name)
-        files = self._get_tracked_files(project_name)
+        manifest_hash = self._get_manifest_hash(project_name)
         status_code, response = self.api_client.sync_project(
             meta["project_id"],
             commit_hash,
             meta["version"],
             meta["description"],
-            files
+            manifest_hash
         )
         if status_code == 200:
             meta["last_api_sync_commit_hash"] = commit_hash
-            with open(meta_path, 'w') as f:
-                json.dump(meta, f, indent=2)
-            subprocess.run(['git', 'add', 'gudoai_meta.json'], cwd=project_name, check=True)
-            subprocess.run(['git', 'commit', '-m', 'GUDOAI: Project synced with API'], cwd=project_name, check=True)
+            self._wait_for_git()  # Commit sebelumnya harus selesai sebelum file ditimpa
+            _write_meta(project_name, meta)
+            self._git_commit_meta(project_name, 'GUDOAI: Project synced with API')
             print("✅ Project state synchronized with API.")
         else:
             print(f"❌ Failed to sync project: {response.get('error', 'Unknown error')}")
 
+    def _open_repo(self, project_name):
+        """Tahapan 5: Membuka (sekali saja) repositori Git proyek lewat pygit2.
+
+        - Mengembalikan None jika pygit2 tidak terpasang.
+        """
+        if pygit2 is None:
+            return None
+        repo = self._repos.get(project_name)
+        if repo is None:
+            try:
+                repo = pygit2.Repository(project_name)
+            except pygit2.GitError as e:
+                raise RuntimeError(f"Failed to open Git repository: {e}")
+            self._repos[project_name] = repo
+        return repo
+
     def _get_current_commit_hash(self, project_name):
         """Tahapan 5: Mendapatkan hash commit terbaru dari branch utama."""
+        self._wait_for_git()
+        repo = self._open_repo(project_name)
+        if repo is not None:
+            try:
+                return str(repo.head.target)
+            except pygit2.GitError as e:
+                raise RuntimeError(f"Failed to get commit hash: {e}")
         result = subprocess.run(
-            ['git', 'rev-parse', 'HEAD'],
+            [self._git, 'rev-parse', 'HEAD'],
             cwd=project_name,
+            env=self._git_read_env,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True
@@ -236,17 +446,43 @@ class GudoaiCore:
         return result.stdout.strip()
 
     def _get_tracked_files(self, project_name):
-        """Tahapan 2 & 5: Mendapatkan daftar file yang sudah dilacak oleh Git."""
+        """Tahapan 2 & 5: Mendapatkan daftar file yang sudah dilacak oleh Git.
+
+        - Index dibaca langsung lewat pygit2, atau dulwich jika pygit2 tidak ada.
+        - `git ls-files` hanya dipakai jika keduanya tidak terpasang.
+        """
+        self._wait_for_git()
+        repo = self._open_repo(project_name)
+        if repo is not None:
+            index = repo.index
+            index.read()  # Muat ulang jika index diubah oleh proses git lain
+            return [entry.path for entry in index]
+        if DulwichRepo is not None:
+            try:
+                with DulwichRepo(project_name) as dulwich_repo:
+                    return [os.fsdecode(path) for path in dulwich_repo.open_index()]
+            except NotGitRepository as e:
+                raise RuntimeError(f"Failed to get tracked files: {e}")
         result = subprocess.run(
-            ['git', 'ls-files'],
+            [self._git, 'ls-files', '-z'],  # -z: path mentah tanpa quoting, dipisah NUL
             cwd=project_name,
+            env=self._git_read_env,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
+            stderr=subprocess.PIPE
         )
         if result.returncode != 0:
-            raise RuntimeError(f"Failed to get tracked files: {result.stderr}")
-        return result.stdout.strip().split('\n')  # Kembalikan list file yang dilacak
+            raise RuntimeError(f"Failed to get tracked files: {os.fsdecode(result.stderr)}")
+        # Kembalikan list file yang dilacak (sama persis dengan hasil pygit2/dulwich)
+        return [os.fsdecode(path) for path in result.stdout.split(b'\0') if path]
+
+    def _get_manifest_hash(self, project_name):
+        """Tahapan 2 & 5: Ringkasan berukuran tetap dari daftar file yang dilacak.
+
+        - BLAKE2b (16 byte) atas path yang diurutkan dan dipisah byte NUL.
+        - Cukup untuk mendeteksi perubahan; daftar lengkap bisa diambil lagi dari Git.
+        """
+        paths = sorted(os.fsencode(path) for path in self._get_tracked_files(project_name))
+        return hashlib.blake2b(b'\0'.join(paths), digest_size=16).hexdigest()
 
     def check_api_status(self, project_name):
         """Tahapan 2 & 3: Mengecek status proyek dari API simulasi.
@@ -255,10 +491,8 @@ class GudoaiCore:
         - Tampilkan informasi dari API.
         - Bandingkan hash commit lokal dengan API.
         """
-        meta_path = os.path.join(project_name, "gudoai_meta.json")
         try:
-            with open(meta_path, 'r') as f:
-                meta = json.load(f)
+            meta = _read_meta(project_name)
         except (FileNotFoundError, json.JSONDecodeError) as e:
             raise ValueError(f"Failed to read metadata: {e}")
         project_id = meta["project_id"]
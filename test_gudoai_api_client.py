@@ -0,0 +1,104 @@
+# test_gudoai_api_client.py
+import os
+import json
+import shutil
+import struct
+import tempfile
+import weakref
+import unittest
+from unittest import mock
+
+from gudoai_api_client import GudoaiApiClient
+
+LEGACY_DB = {
+    f"legacy-{i}": {
+        "project_id": f"legacy-{i}",
+        "project_name": f"proj{i}",
+        "commit_hash": "c0",
+        "version": 2,
+        "description": "legacy",
+        "file_manifest": ["gudoai_meta.json"],
+        "is_deployed": False
+    }
+    for i in range(5)
+}
+
+
+class GudoaiApiClientTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.mkdtemp()
+        os.chdir(self._tmp)
+        GudoaiApiClient._cache.clear()
+
+    def tearDown(self):
+        GudoaiApiClient._cache.clear()
+        os.chdir(self._cwd)
+        shutil.rmtree(self._tmp)
+
+    def _register(self, project_id='p1', version=1):
+        with GudoaiApiClient() as client:
+            status, _ = client.register_project(project_id, 'proj', 'c0', version, 'desc')
+        self.assertEqual(status, 201)
+
+    def test_torn_tail_is_repaired_on_next_append(self):
+        """Frame terpotong di akhir journal tidak boleh menelan frame yang ditulis sesudahnya."""
+        self._register()
+        with open('.gudoai_api_db.msgpack', 'ab') as f:
+            f.write(struct.pack('>I', 1000) + b'partial')
+
+        for version in range(2, 10):
+            with GudoaiApiClient() as client:
+                status, _ = client.sync_project('p1', f'c{version}', version, 'desc', 'hash')
+            self.assertEqual(status, 200)
+
+        client = GudoaiApiClient()
+        status, project = client.get_project_status('p1')
+        self.assertEqual(status, 200)
+        self.assertEqual(project['version'], 9)
+        self.assertEqual(project['last_synced_commit'], 'c9')
+        self.assertFalse(client._torn_tail)
+
+    def test_closed_client_is_released_and_keeps_its_directory(self):
+        """Klien yang sudah ditutup tidak ditahan hook atexit; path database tidak ikut cwd."""
+        client = GudoaiApiClient()
+        os.makedirs('elsewhere')
+        os.chdir('elsewhere')
+        client.register_project('p1', 'proj', 'c0', 1, 'desc')
+        client.close()
+        os.chdir(self._tmp)
+        self.assertTrue(os.path.exists('.gudoai_api_db.msgpack'))
+        self.assertFalse(os.path.exists(os.path.join('elsewhere', '.gudoai_api_db.msgpack')))
+
+        ref = weakref.ref(client)
+        del client
+        self.assertIsNone(ref())
+
+    def _write_legacy_db(self):
+        with open('.gudoai_api_db.json', 'w') as f:
+            json.dump(LEGACY_DB, f, indent=2)
+
+    def test_failed_migration_keeps_legacy_database(self):
+        """Jika compaction pertama gagal, database JSON lama tetap dipakai."""
+        self._write_legacy_db()
+        client = GudoaiApiClient()
+        client.register_project('p1', 'proj', 'c0', 1, 'desc')
+        with mock.patch('gudoai_api_client.atomic_write', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                client.close()
+        self.assertFalse(os.path.exists('.gudoai_api_db.msgpack'))
+
+        self.assertEqual(sorted(GudoaiApiClient().projects), sorted(LEGACY_DB))
+
+    def test_empty_journal_falls_back_to_legacy_database(self):
+        self._write_legacy_db()
+        open('.gudoai_api_db.msgpack', 'wb').close()
+        self.assertEqual(sorted(GudoaiApiClient().projects), sorted(LEGACY_DB))
+
+        with GudoaiApiClient() as client:
+            client.register_project('p1', 'proj', 'c0', 1, 'desc')
+        self.assertEqual(sorted(GudoaiApiClient().projects), sorted(LEGACY_DB) + ['p1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
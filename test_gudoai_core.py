@@ -0,0 +1,234 @@
+# test_gudoai_core.py
+import os
+import json
+import shutil
+import contextlib
+import tempfile
+import subprocess
+import threading
+import unittest
+from unittest import mock
+
+import gudoai_core
+from gudoai_core import GudoaiCore
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "gudoai",
+    "GIT_AUTHOR_EMAIL": "gudoai@example.com",
+    "GIT_COMMITTER_NAME": "gudoai",
+    "GIT_COMMITTER_EMAIL": "gudoai@example.com",
+}
+
+
+class GudoaiCoreTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.mkdtemp()
+        os.chdir(self._tmp)
+        self._env = mock.patch.dict(os.environ, GIT_ENV)
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        os.chdir(self._cwd)
+        shutil.rmtree(self._tmp)
+
+    def _git_show_meta(self, project_name, rev):
+        result = subprocess.run(
+            ['git', 'show', f'{rev}:gudoai_meta.json'],
+            cwd=project_name,
+            stdout=subprocess.PIPE,
+            check=True
+        )
+        return json.loads(result.stdout)
+
+    def _git(self, project_name, *args):
+        return subprocess.run(
+            ['git', *args],
+            cwd=project_name,
+            stdout=subprocess.PIPE,
+            text=True,
+            check=True
+        ).stdout
+
+    def _commit_file(self, project_name, name, content):
+        with open(os.path.join(project_name, name), 'w') as f:
+            f.write(content)
+        self._git(project_name, 'add', name)
+        self._git(project_name, 'commit', '-q', '-m', f'edit {name}')
+
+    def _project_with_feature(self, feature_files, master_files=()):
+        """Membuat proyek dengan branch feature/f; commit tambahan opsional di master."""
+        with GudoaiCore() as core:
+            core.init_project('proj')
+            core.create_feature_branch('proj', 'f')
+        for name, content in feature_files:
+            self._commit_file('proj', name, content)
+        self._git('proj', 'checkout', '-q', 'master')
+        for name, content in master_files:
+            self._commit_file('proj', name, content)
+
+    def _isolate_git_config(self):
+        """Menyembunyikan konfigurasi Git global/sistem sehingga identitas hanya dari env."""
+        home = tempfile.mkdtemp(dir=self._tmp)
+        env = mock.patch.dict(os.environ, {'HOME': home, 'XDG_CONFIG_HOME': home, 'GIT_CONFIG_NOSYSTEM': '1'})
+        env.start()
+        self.addCleanup(env.stop)
+        if gudoai_core.pygit2 is not None:
+            levels = (gudoai_core.pygit2.GIT_CONFIG_LEVEL_GLOBAL, gudoai_core.pygit2.GIT_CONFIG_LEVEL_SYSTEM,
+                      gudoai_core.pygit2.GIT_CONFIG_LEVEL_XDG)
+            search_path = gudoai_core.pygit2.settings.search_path
+            saved = {level: search_path[level] for level in levels}
+            for level in levels:
+                search_path[level] = home
+            self.addCleanup(lambda: [search_path.__setitem__(k, v) for k, v in saved.items()])
+
+    def test_merge_fast_forward(self):
+        self._project_with_feature([('a.txt', 'a')])
+        feature_tip = self._git('proj', 'rev-parse', 'feature/f').strip()
+        with GudoaiCore() as core:
+            self.assertTrue(core.merge_to_main('proj', 'f'))
+        self.assertEqual(self._git('proj', 'rev-parse', 'master').strip(), feature_tip)
+        self.assertEqual(self._git('proj', 'status', '--porcelain'), '')
+        self.assertTrue(os.path.exists(os.path.join('proj', 'a.txt')))
+
+    def test_merge_creates_two_parent_commit(self):
+        self._project_with_feature([('a.txt', 'a')], master_files=[('m.txt', 'm')])
+        feature_tip = self._git('proj', 'rev-parse', 'feature/f').strip()
+        master_tip = self._git('proj', 'rev-parse', 'master').strip()
+        with GudoaiCore() as core:
+            self.assertTrue(core.merge_to_main('proj', 'f'))
+        parents = self._git('proj', 'log', '-1', '--format=%P', 'master').split()
+        self.assertEqual(parents, [master_tip, feature_tip])
+        self.assertEqual(self._git('proj', 'status', '--porcelain'), '')
+        self.assertFalse(os.path.exists(os.path.join('proj', '.git', 'MERGE_HEAD')))
+        self.assertTrue(os.path.exists(os.path.join('proj', 'a.txt')))
+        self.assertTrue(os.path.exists(os.path.join('proj', 'm.txt')))
+
+    def test_merge_conflict_returns_false(self):
+        self._project_with_feature([('gudoai_meta.json', 'feature')], master_files=[('gudoai_meta.json', 'master')])
+        with GudoaiCore() as core:
+            self.assertFalse(core.merge_to_main('proj', 'f'))
+        self.assertEqual(self._git('proj', 'status', '--porcelain'), 'UU gudoai_meta.json\n')
+
+    def test_merge_missing_branch_returns_false(self):
+        self._project_with_feature([('a.txt', 'a')])
+        master_tip = self._git('proj', 'rev-parse', 'master').strip()
+        with GudoaiCore() as core:
+            self.assertFalse(core.merge_to_main('proj', 'nope'))
+        self.assertEqual(self._git('proj', 'rev-parse', 'master').strip(), master_tip)
+
+    def test_merge_uses_identity_from_env(self):
+        """Tanpa user.name/user.email di konfigurasi, identitas dari GIT_* tetap dipakai."""
+        self._isolate_git_config()
+        self._project_with_feature([('a.txt', 'a')], master_files=[('m.txt', 'm')])
+        with mock.patch.dict(os.environ, {'GIT_COMMITTER_NAME': 'merger', 'GIT_COMMITTER_EMAIL': 'merger@example.com'}):
+            with GudoaiCore() as core:
+                self.assertTrue(core.merge_to_main('proj', 'f'))
+        identity = self._git('proj', 'log', '-1', '--format=%an <%ae>|%cn <%ce>', 'master').strip()
+        self.assertEqual(identity, 'gudoai <gudoai@example.com>|merger <merger@example.com>')
+        self.assertEqual(self._git('proj', 'status', '--porcelain'), '')
+
+    @unittest.skipIf(gudoai_core.pygit2 is None, 'pygit2 tidak terpasang')
+    def test_failed_merge_commit_is_rolled_back(self):
+        self._project_with_feature([('a.txt', 'a')], master_files=[('m.txt', 'm')])
+        master_tip = self._git('proj', 'rev-parse', 'master').strip()
+        with GudoaiCore() as core:
+            with mock.patch.object(gudoai_core.pygit2.Repository, 'create_commit', side_effect=gudoai_core.pygit2.GitError('boom')):
+                with self.assertRaises(RuntimeError):
+                    core.merge_to_main('proj', 'f')
+        self.assertEqual(self._git('proj', 'rev-parse', 'master').strip(), master_tip)
+        self.assertFalse(os.path.exists(os.path.join('proj', '.git', 'MERGE_HEAD')))
+        self.assertEqual(self._git('proj', 'status', '--porcelain'), '')
+
+    def test_multiple_mutations_in_one_session(self):
+        """Setiap commit metadata harus berisi versi yang sesuai pesannya."""
+        with GudoaiCore() as core:
+            core.init_project('proj')
+            for i in range(5):
+                core.update_metadata('proj', f'desc {i}')
+            core.register_project('proj')
+            core.sync_project('proj')
+
+        log = subprocess.run(
+            ['git', 'log', '--format=%H %s'],
+            cwd='proj',
+            stdout=subprocess.PIPE,
+            text=True,
+            check=True
+        ).stdout.splitlines()
+        subjects = [line.split(' ', 1)[1] for line in log]
+        self.assertEqual(subjects, [
+            'GUDOAI: Project synced with API',
+            'GUDOAI: Project registered to API',
+        ] + [f'GUDOAI: Updated metadata - version {v}' for v in range(5, 0, -1)] + [
+            'GUDOAI: Initial project setup',
+        ])
+        for line in log:
+            rev, subject = line.split(' ', 1)
+            if subject.startswith('GUDOAI: Updated metadata - version '):
+                version = int(subject.rsplit(' ', 1)[1])
+                meta = self._git_show_meta('proj', rev)
+                self.assertEqual(meta['version'], version)
+                self.assertEqual(meta['description'], f'desc {version - 1}')
+
+        meta = self._git_show_meta('proj', 'HEAD')
+        self.assertTrue(meta['api_registered'])
+        self.assertEqual(meta['version'], 6)
+
+    def test_closed_sessions_do_not_leak_git_workers(self):
+        """close() harus menghentikan worker commit; sesi tanpa commit tidak membuat worker."""
+        with GudoaiCore() as core:
+            core.init_project('proj')
+        threads = threading.active_count()
+        for i in range(10):
+            with GudoaiCore() as core:
+                core.update_metadata('proj', f'desc {i}')
+            self.assertIsNone(core._git_pool)
+        with GudoaiCore() as core:
+            core.create_feature_branch('proj', 'f')
+            self.assertIsNone(core._git_pool)
+        self.assertEqual(threading.active_count(), threads)
+        self.assertEqual(self._git_show_meta('proj', 'HEAD')['version'], 10)
+
+    def test_failed_background_commit_names_its_message(self):
+        with GudoaiCore() as core:
+            core.init_project('proj')
+        hook = os.path.join('proj', '.git', 'hooks', 'pre-commit')
+        with open(hook, 'w') as f:
+            f.write('#!/bin/sh\nexit 1\n')
+        os.chmod(hook, 0o755)
+        with self.assertRaises(RuntimeError) as cm:
+            with GudoaiCore() as core:
+                core.update_metadata('proj', 'desc')
+        self.assertIn("'GUDOAI: Updated metadata - version 1'", str(cm.exception))
+
+    def test_manifest_hash_is_backend_independent(self):
+        """pygit2, dulwich, dan `git ls-files` harus menghasilkan hash manifest yang sama."""
+        with GudoaiCore() as core:
+            core.init_project('proj')
+        for name in ('\u00fc.txt', 'with space.txt', 'plain.txt'):
+            with open(os.path.join('proj', name), 'w') as f:
+                f.write(name)
+        subprocess.run(['git', 'add', '.'], cwd='proj', check=True)
+
+        hashes = {}
+        backends = {
+            'pygit2': {},
+            'dulwich': {'pygit2': None},
+            'git': {'pygit2': None, 'DulwichRepo': None},
+        }
+        for backend, disabled in backends.items():
+            if backend == 'pygit2' and gudoai_core.pygit2 is None:
+                continue
+            if backend == 'dulwich' and gudoai_core.DulwichRepo is None:
+                continue
+            with mock.patch.multiple(gudoai_core, **disabled) if disabled else contextlib.nullcontext():
+                core = GudoaiCore()
+                self.assertIn('\u00fc.txt', core._get_tracked_files('proj'))
+                hashes[backend] = core._get_manifest_hash('proj')
+        self.assertEqual(len(set(hashes.values())), 1, hashes)
+
+
+if __name__ == '__main__':
+    unittest.main()